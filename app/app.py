@@ -4,25 +4,24 @@
 # Imports (with purpose):
 # - streamlit as st: UI framework
 # - typing: clean signatures
-# - datetime: display timestamps in the activity table
 # - local services: use your orchestrator to fetch balances & persist later
+# Form-only imports (uuid, datetime, models, split strategies) live inside the
+# dialog functions so the login path doesn't pay for them.
 import sys, os
-# Ensure parent directory (project root) is on Python path
-sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+# Ensure parent directory (project root) is on Python path, once per process
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
 
 import streamlit as st
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, List, Tuple
+import heapq
+from operator import itemgetter
 
 from core.services.manager import ExpenseManager
 from core.services.auth import AuthService
 from core.utils.money import fmt, qround, EPS
 
-from datetime import datetime
-from core.models.splits import EqualSplit, ExactSplit, ShareSplit
-from core.models.expense import Expense
-from core.models.expense import Settlement  # NEW
-import uuid  # for unique IDs
-
 # ---- Page config: title, favicon, layout
 st.set_page_config(page_title="Bill Splitter", page_icon="💸", layout="wide")
 
@@ -48,6 +47,28 @@ with st.sidebar:
 auth: AuthService = st.session_state.services["auth"]
 mgr: ExpenseManager = st.session_state.services["mgr"]
 
+# ---- Rerun caches: keyed on the ledger revision so they only recompute after a mutation.
+# The cache is process-wide, so entries also key on the manager's instance_id (id() is
+# reused once a session's manager is collected). `_mgr` is passed in, not hashed.
+@st.cache_data(show_spinner=False, max_entries=256)
+def _cached_totals(_mgr: ExpenseManager, mgr_key: str, user: str, rev: int) -> Tuple[float, float]:
+    return _mgr.dashboard_totals(user)
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _cached_balances(_mgr: ExpenseManager, mgr_key: str, user: str, rev: int) -> Tuple[Tuple[str, float], ...]:
+    # Sorted tuple of pairs rather than a dict: cheaper for the cache to hash and copy out
+    return tuple(sorted(_mgr.balances_for(user).items()))
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _cached_counterparties(_mgr: ExpenseManager, mgr_key: str, user: str, rev: int) -> Tuple[str, ...]:
+    # Settle dialog options: users with a non-zero balance (pairs are already key-sorted)
+    return tuple(k for k, v in _cached_balances(_mgr, mgr_key, user, rev) if abs(v) > EPS)
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _cached_recent_events(_mgr: ExpenseManager, mgr_key: str, rev: int, limit: int = 10) -> List[Dict[str, Any]]:
+    # Newest first; partial sort of the top `limit` instead of sorting the whole feed
+    return heapq.nlargest(limit, _mgr.list_events(), key=lambda x: x["when"] or "")
+
 # ---- Session auth state
 if "auth_state" not in st.session_state:
     st.session_state.auth_state = {"logged_in": False, "username": None}
@@ -81,7 +102,8 @@ def login_view():
         submitted = st.form_submit_button("Login", use_container_width=True)
         if submitted:
             if auth.login(username, password):
-                st.session_state.auth_state = {"logged_in": True, "username": username}
+                # Same normalisation AuthService applies, so ledger keys stay consistent
+                st.session_state.auth_state = {"logged_in": True, "username": username.strip().lower()}
                 st.success("Login successful! Redirecting to dashboard…")
                 st.rerun()
             else:
@@ -98,7 +120,7 @@ def login_view():
 # ---- Dashboard cards: What you owe vs Others owe you
 def dashboard_cards(username: str):
     # manager provides totals already aggregated
-    you_owe, others_owe_you = mgr.dashboard_totals(username)
+    you_owe, others_owe_you = _cached_totals(mgr, mgr.instance_id, username, mgr._rev)
     c = st.session_state.ui["currency"]
 
     c1, c2, c3 = st.columns([1, 1, 2])
@@ -117,72 +139,62 @@ def dashboard_cards(username: str):
 # ---- Balances table: pairwise net amounts for the current user
 def balances_table(username: str):
     st.markdown("### Your balances (pairwise)")
-    net: Dict[str, float] = mgr.balances_for(username)
-    if not net:
+    currency = st.session_state.ui["currency"]
+    rev_key = (mgr.instance_id, username, mgr._rev)
+
+    # Session-level reuse: ledger-derived columns rebuild only on a new revision,
+    # the formatted Amount column only when the currency (or revision) changes.
+    cached = st.session_state.get("_bal_cache")
+    if cached is None or cached["rev_key"] != rev_key:
+        net = _cached_balances(mgr, mgr.instance_id, username, mgr._rev)
+        # Case-insensitive order: lowercase each name once, sort on a C-level key
+        items = [((other.lower(), other), amt) for other, amt in net]
+        items.sort(key=itemgetter(0))
+        # positive => you owe them; negative => they owe you
+        base = [{"Counterparty": other, "Direction": "You owe" if amt > 0 else "Owes you", "_amt": abs(amt)}
+                for (_, other), amt in items]
+        cached = {"rev_key": rev_key, "base": base, "currency": None, "rows": []}
+    if cached["currency"] != currency:
+        cached["rows"] = [{"Counterparty": r["Counterparty"], "Amount": fmt(r["_amt"], currency),
+                           "Direction": r["Direction"]} for r in cached["base"]]
+        cached["currency"] = currency
+    st.session_state["_bal_cache"] = cached
+
+    if not cached["rows"]:
         st.info("No balances yet. Use **Record expense** to add your first item.")
         return
 
-    # Render simple table: positive => you owe them; negative => they owe you
-    rows = []
-    for other, amt in sorted(net.items(), key=lambda x: x[0].lower()):
-        status = "You owe" if amt > 0 else "Owes you"
-        # balances_table
-        rows.append({"Counterparty": other, "Amount": fmt(abs(amt), st.session_state.ui["currency"]),
-                     "Direction": "You owe" if amt > 0 else "Owes you"})
-
-    st.table(rows)
+    st.table(cached["rows"])
 
 # ---- Recent activity (lightweight Day 3: show raw cached dicts)
 def recent_activity():
     st.markdown("### Recent activity")
-    # For Day 3, we’ll just read raw cache dicts; we’ll pretty this up later
-    exps = mgr.cache.list_expenses()
-    sets = mgr.cache.list_settlements()
-
-    # Coalesce into a single timeline
-    events = []
-    for e in exps:
-        events.append({
-            "when": e.get("date"),
-            "type": "Expense",
-            "who": e.get("payer"),
-            "desc": e.get("description"),
-            "amount": e.get("amount"),
-        })
-    for s in sets:
-        events.append({
-            "when": s.get("date"),
-            "type": "Settlement",
-            "who": f'{s.get("payer")} → {s.get("payee")}',
-            "desc": s.get("description"),
-            "amount": s.get("amount"),
-        })
-
+    events = _cached_recent_events(mgr, mgr.instance_id, mgr._rev)
     if not events:
         st.caption("No activity yet.")
         return
 
-    # Sort newest first
-    events.sort(key=lambda x: x["when"] or "", reverse=True)
-
     # Render compact
-    for ev in events[:10]:
+    for ev in events:
         with st.container(border=True):
             tag = "🧾 Expense" if ev["type"] == "Expense" else "✅ Settlement"
             st.write(f'{tag} • {ev["who"]} • {fmt(float(ev["amount"]), st.session_state.ui["currency"])}')
             if ev.get("desc"): st.caption(ev["desc"])
-            if ev.get("when"): st.caption(ev["when"])
+            if ev.get("when_iso"): st.caption(ev["when_iso"])
 
 def open_settle_dialog(username: str):
     """
     'Settle up' dialog with dynamic counterparty selection.
     The counterparty selector is rendered outside the form so changes take effect immediately.
     """
+    import uuid  # for unique IDs
+    from core.models.expense import Settlement
+
     mgr: ExpenseManager = st.session_state.services["mgr"]
 
-    # Always compute the latest balances
-    net = mgr.balances_for(username)
-    counterparties = sorted([k for k, v in net.items() if abs(v) > EPS])
+    # Latest balances, cached per ledger revision (widget changes in the dialog reuse them)
+    net = dict(_cached_balances(mgr, mgr.instance_id, username, mgr._rev))
+    counterparties = list(_cached_counterparties(mgr, mgr.instance_id, username, mgr._rev))
 
     # If no one to settle with, bail early (works in dialog or inline)
     def _no_cp_ui():
@@ -309,6 +321,11 @@ def open_record_expense(username: str):
     Renders a 'Record expense' form.
     If Streamlit supports st.dialog, show it as a dialog; otherwise render inline.
     """
+    import uuid  # for unique IDs
+    from datetime import datetime, timezone
+    from core.models.expense import Expense
+    from core.models.splits import EqualSplit, ExactSplit, ShareSplit
+
     mgr = st.session_state.services["mgr"]
 
     # The form UI as a function so we can use it with st.dialog decorator or inline
@@ -423,7 +440,7 @@ def open_record_expense(username: str):
                     split_strategy=strategy,
                     notes=notes.strip(),
                     group_id=group_id,
-                    date=datetime.utcnow(),
+                    date=datetime.now(timezone.utc),
                 )
 
                 # --- Disable submit while saving + toast feedback ---
@@ -4,8 +4,8 @@ from __future__ import annotations
 # dataclasses: reduce boilerplate for “data holder” classes
 from dataclasses import dataclass, field
 
-# datetime: we timestamp expenses/settlements and serialize them
-from datetime import datetime
+# datetime: we timestamp expenses/settlements (tz-aware UTC) and serialize them
+from datetime import datetime, timezone
 
 # typing: Dict for mappings, Optional for nullable group_id
 from typing import Dict, Optional
@@ -24,8 +24,14 @@ class Expense:
     participants: Dict[str, float | int]      # strategy-dependent payload
     split_strategy: SplitStrategy              # Equal/Exact/Share object
     notes: str = ""
-    date: datetime = field(default_factory=datetime.utcnow)
+    date: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
     group_id: Optional[str] = None
+    date_iso: str = field(init=False, repr=False)  # display string, computed once
+
+    def __post_init__(self) -> None:
+        if self.date.tzinfo is None:  # naive datetimes are taken as UTC
+            self.date = self.date.replace(tzinfo=timezone.utc)
+        self.date_iso = self.date.isoformat(timespec="seconds")
 
     def allocations(self) -> Dict[str, float]:
         """Return per-participant owed amounts per the chosen strategy."""
@@ -40,5 +46,11 @@ class Settlement:
     payee: str           # who receives
     amount: float
     description: str = ""
-    date: datetime = field(default_factory=datetime.utcnow)
+    date: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
     notes: str = ""
+    date_iso: str = field(init=False, repr=False)  # display string, computed once
+
+    def __post_init__(self) -> None:
+        if self.date.tzinfo is None:  # naive datetimes are taken as UTC
+            self.date = self.date.replace(tzinfo=timezone.utc)
+        self.date_iso = self.date.isoformat(timespec="seconds")
@@ -1,42 +1,98 @@
 # Forward-ref annotations for cleaner type hints
 from __future__ import annotations
 
-# defaultdict: nested dict with auto-creation (balance[A][B] pattern)
-from collections import defaultdict
-
-# Dict type hint for clarity
-from typing import Dict
+# Dict/Iterable/Set/Tuple type hints for clarity
+from typing import Dict, Iterable, Set, Tuple, Union
 
 # Import models for applying domain logic
 from .expense import Expense, Settlement
 
+_NO_EDGES: frozenset = frozenset()
+
 
 class Ledger:
     """
-    Tracks net pairwise balances. balance[A][B] > 0 means A owes B that amount.
+    Tracks net pairwise balances. balance[(A, B)] > 0 means A owes B that amount.
     """
 
     def __init__(self) -> None:
-        # Two-level mapping: who owes whom
-        self.balance: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        # Flat mapping keyed by (debtor, creditor); zero edges are dropped
+        self.balance: Dict[Tuple[str, str], float] = {}
+        # Adjacency indices over non-zero edges (A, B):
+        #   _by_debtor[A] contains B, _by_creditor[B] contains A
+        self._by_debtor: Dict[str, Set[str]] = {}
+        self._by_creditor: Dict[str, Set[str]] = {}
+        # Running dashboard totals per user (a fresh Ledger, i.e. a full rebuild, resets them):
+        #   _positive_sum[u] = what u owes others, _negative_sum[u] = what others owe u
+        self._positive_sum: Dict[str, float] = {}
+        self._negative_sum: Dict[str, float] = {}
+
+    def _post(self, debtor: str, creditor: str, delta: float) -> None:
+        """
+        Adjust balance[(debtor, creditor)] by delta and keep the indices and
+        running totals in sync.
+        """
+        key = (debtor, creditor)
+        old = self.balance.get(key, 0.0)
+        amt = old + delta
+
+        # Pair net from the debtor's side (+ve => debtor owes creditor) before/after
+        rev = self.balance.get((creditor, debtor), 0.0)
+        owes = max(amt - rev, 0.0) - max(old - rev, 0.0)
+        owed = max(rev - amt, 0.0) - max(rev - old, 0.0)
+        if owes or owed:
+            pos, neg = self._positive_sum, self._negative_sum
+            pos[debtor] = pos.get(debtor, 0.0) + owes
+            neg[debtor] = neg.get(debtor, 0.0) + owed
+            pos[creditor] = pos.get(creditor, 0.0) + owed
+            neg[creditor] = neg.get(creditor, 0.0) + owes
+
+        if abs(amt) > 1e-9:
+            self.balance[key] = amt
+            self._by_debtor.setdefault(debtor, set()).add(creditor)
+            self._by_creditor.setdefault(creditor, set()).add(debtor)
+        else:
+            self.balance.pop(key, None)
+            self._by_debtor.get(debtor, set()).discard(creditor)
+            self._by_creditor.get(creditor, set()).discard(debtor)
 
     def apply_expense(self, exp: Expense) -> None:
         """
         For an expense paid by exp.payer, every other participant owes the payer their share.
         """
-        alloc = exp.allocations()
-        for user, owed in alloc.items():
-            if user == exp.payer:
-                # Payer does not owe themselves
-                continue
-            self.balance[user][exp.payer] += owed
+        # Strategy writes each non-payer share straight into the ledger (payer skipped)
+        exp.split_strategy.allocate_for_payer(exp.amount, exp.participants, exp.payer, self._post)
 
     def apply_settlement(self, st: Settlement) -> None:
         """
         A payment from st.payer to st.payee reduces what payer owes payee,
         or reduces what payee owes payer (if the sign flips via netting).
         """
-        self.balance[st.payer][st.payee] -= st.amount
+        self._post(st.payer, st.payee, -st.amount)
+
+    def apply_many(self, records: Iterable[Union[Expense, Settlement]]) -> None:
+        """
+        Bulk replay: sum every allocation into a flat per-edge delta map first,
+        then post each distinct (debtor, creditor) edge once. Index and totals
+        upkeep then scales with the number of edges, not the number of records.
+        """
+        deltas: Dict[Tuple[str, str], float] = {}
+
+        def add(debtor: str, creditor: str, amt: float) -> None:
+            key = (debtor, creditor)
+            deltas[key] = deltas.get(key, 0.0) + amt
+
+        for rec in records:
+            if isinstance(rec, Expense):
+                rec.split_strategy.allocate_for_payer(rec.amount, rec.participants, rec.payer, add)
+            else:
+                add(rec.payer, rec.payee, -rec.amount)
+        for (debtor, creditor), amt in deltas.items():
+            self._post(debtor, creditor, amt)
+
+    def totals_for(self, me: str) -> Tuple[float, float]:
+        """(you_owe_total, others_owe_you_total) for `me`, maintained incrementally."""
+        return self._positive_sum.get(me, 0.0), self._negative_sum.get(me, 0.0)
 
     def net_for(self, me: str) -> Dict[str, float]:
         """
@@ -44,19 +100,13 @@ class Ledger:
         Combines both directions for each counterparty.
         """
         result: Dict[str, float] = {}
+        bal = self.balance
 
-        # What I owe others
-        for other, amt in self.balance.get(me, {}).items():
-            if abs(amt) > 1e-9:
+        # Every counterparty I owe or who owes me, from the adjacency indices.
+        # Round in the same pass (display stability) and drop pairs that net to zero.
+        others = self._by_debtor.get(me, _NO_EDGES) | self._by_creditor.get(me, _NO_EDGES)
+        for other in others:
+            amt = round(bal.get((me, other), 0.0) - bal.get((other, me), 0.0), 2)
+            if amt:
                 result[other] = amt
-
-        # What others owe me
-        for other, mp in self.balance.items():
-            if other == me:
-                continue
-            amt = mp.get(me, 0.0)
-            if abs(amt) > 1e-9:
-                result[other] = result.get(other, 0.0) - amt
-
-        # Round for display stability
-        return {k: round(v, 2) for k, v in result.items()}
\ No newline at end of file
+        return result
@@ -1,55 +1,67 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Dict, List, Tuple
+from itertools import chain
+from typing import Callable, Dict, List, Tuple
 from core.utils.money import qround, EPS
 
+# Sink for fused allocation: post(debtor, creditor, amount)
+Post = Callable[[str, str, float], None]
+
+def _spread(cents: List[int], left: int) -> List[float]:
+    """
+    Settle `left` leftover cents (either sign) one each on the leading participants,
+    cycling if needed: the same outcome as the old per-cent fix-up loop, in one pass,
+    so ledgers rebuilt from stored expenses keep their balances.
+    """
+    step = 1 if left > 0 else -1
+    q, r = divmod(abs(left), len(cents))
+    return [(c + step * (q + (i < r))) / 100.0 for i, c in enumerate(cents)]
+
 class SplitStrategy(ABC):
     @abstractmethod
-    def split(self, amount: float, participants: Dict[str, float | int]) -> Dict[str, float]:
+    def _shares(self, amount: float, participants: Dict[str, float | int]) -> Tuple[Tuple[str, ...], List[float]]:
+        """Participants and their shares as parallel sequences."""
         ...
 
-class EqualSplit(SplitStrategy):
     def split(self, amount: float, participants: Dict[str, float | int]) -> Dict[str, float]:
-        users = list(participants.keys())
+        users, shares = self._shares(amount, participants)
+        return dict(zip(users, shares))
+
+    def allocate_for_payer(self, amount: float, participants: Dict[str, float | int],
+                           payer: str, post: Post) -> None:
+        """Post every non-payer's share as owed to payer (e.g. straight into a Ledger)."""
+        # Fused path: no intermediate dict, shares go straight to the sink; the payer
+        # is located once and skipped by index, so the loop itself has no branch
+        users, shares = self._shares(amount, participants)
+        try:
+            k = users.index(payer)
+        except ValueError:  # payer isn't a participant: everyone owes
+            k = len(users)
+        for i in chain(range(k), range(k + 1, len(users))):
+            post(users[i], payer, shares[i])
+
+class EqualSplit(SplitStrategy):
+    def _shares(self, amount: float, participants: Dict[str, float | int]) -> Tuple[Tuple[str, ...], List[float]]:
+        users = tuple(participants)
         n = len(users)
-        base = amount / n
-        # Initial rounded shares
-        shares = [qround(base) for _ in users]
-        # Distribute remainder cents fairly by largest fractional part
-        diff = qround(amount - sum(shares))
-        # If rounding caused a shortfall/excess, adjust a cent at a time
-        i = 0
-        step = 0.01 if diff > 0 else -0.01
-        while abs(diff) >= 0.01 - EPS and i < 1000:
-            idx = i % n
-            shares[idx] = qround(shares[idx] + step)
-            diff = qround(amount - sum(shares))
-            i += 1
-        return {u: s for u, s in zip(users, shares)}
+        # Work in integer cents: per-head share rounded to the cent, and the
+        # remainder (positive or negative, at most n/2 cents) spread from the front
+        per = round(round(amount / n, 2) * 100)
+        return users, _spread([per] * n, round(amount * 100) - per * n)
 
 class ExactSplit(SplitStrategy):
-    def split(self, amount: float, participants: Dict[str, float | int]) -> Dict[str, float]:
+    def _shares(self, amount: float, participants: Dict[str, float | int]) -> Tuple[Tuple[str, ...], List[float]]:
         total = float(sum(float(v) for v in participants.values()))
         if abs(total - amount) > 0.01 + EPS:  # allow 1 cent float wiggle
             raise ValueError(f"Exact split totals {total:.2f}, not {amount:.2f}")
-        return {name: qround(float(v)) for name, v in participants.items()}
+        return tuple(participants), [qround(float(v)) for v in participants.values()]
 
 class ShareSplit(SplitStrategy):
-    def split(self, amount: float, participants: Dict[str, float | int]) -> Dict[str, float]:
+    def _shares(self, amount: float, participants: Dict[str, float | int]) -> Tuple[Tuple[str, ...], List[float]]:
         weights = {k: float(v) for k, v in participants.items()}
         if any(w <= 0 for w in weights.values()):
             raise ValueError("All shares must be positive.")
         total_w = sum(weights.values())
-        raw = {k: (amount * (w / total_w)) for k, w in weights.items()}
-        # Round & fix remainder like Equal
-        users = list(raw.keys())
-        shares = [qround(raw[u]) for u in users]
-        diff = qround(amount - sum(shares))
-        i = 0
-        step = 0.01 if diff > 0 else -0.01
-        while abs(diff) >= 0.01 - EPS and i < 1000:
-            idx = i % len(users)
-            shares[idx] = qround(shares[idx] + step)
-            diff = qround(amount - sum(shares))
-            i += 1
-        return {u: s for u, s in zip(users, shares)}
+        # Round each share to the cent, then spread the leftover cents like EqualSplit
+        cents = [round(round(amount * (w / total_w), 2) * 100) for w in weights.values()]
+        return tuple(weights), _spread(cents, round(amount * 100) - sum(cents))
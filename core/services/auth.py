@@ -1,23 +1,66 @@
 # typing.Optional: clarify when a method may return no value
 from typing import Optional, Dict
 
+# hashlib/hmac/os: salted PBKDF2 hashes + constant-time digest comparison
+import hashlib
+import hmac
+import os
+
+# lru_cache: username normalisation is repeated on every login/profile lookup
+from functools import lru_cache
+
+_PBKDF2_ITERATIONS = 100_000
+
+
+def _hash_password(password: str) -> str:
+    """Return 'salt$digest' (hex) for a fresh random salt."""
+    salt = os.urandom(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, _PBKDF2_ITERATIONS)
+    return f"{salt.hex()}${digest.hex()}"
+
+
+def _check_password(password: str, pwhash: str) -> bool:
+    """Recompute the digest with the stored salt and compare in constant time."""
+    salt_hex, digest_hex = pwhash.split("$", 1)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), bytes.fromhex(salt_hex), _PBKDF2_ITERATIONS)
+    return hmac.compare_digest(digest, bytes.fromhex(digest_hex))
+
+
+# Verified against when the user is unknown, so both branches cost one PBKDF2 run
+_DUMMY_HASH = _hash_password("dummy")
+
+
+@lru_cache(maxsize=256)
+def _normalize_username(username: str) -> str:
+    return username.strip().lower()
+
 
 class AuthService:
     """
-    Minimal, local-only auth. In a real app, you'd hash passwords and never store plain text.
+    Minimal, local-only auth. Passwords are kept only as salted PBKDF2 hashes.
     For our demo: a small user registry plus login & forgot-password stubs.
     """
     def __init__(self, seed_users: Optional[Dict[str, Dict[str, str]]] = None) -> None:
-        # Structure: { "user@example.com": {"password": "...", "name": "You"} }
-        self._users: Dict[str, Dict[str, str]] = seed_users or {
+        # Seed input: { "user@example.com": {"password": "...", "name": "You"} }
+        # Stored as:  { "user@example.com": {"pwhash": "salt$digest", "name": "You"} }
+        seed = seed_users or {
             "you@example.com": {"password": "pass123", "name": "You"},
             "sam@example.com": {"password": "pass123", "name": "Sam"},
         }
+        self._users: Dict[str, Dict[str, str]] = {}
+        for username, rec in seed.items():
+            rec = dict(rec)
+            if "password" in rec:
+                rec["pwhash"] = _hash_password(rec.pop("password"))
+            self._users[_normalize_username(username)] = rec
 
     def login(self, username: str, password: str) -> bool:
         """Return True if credentials match."""
-        rec = self._users.get(username)
-        return bool(rec and rec.get("password") == password)
+        rec = self._users.get(_normalize_username(username))
+        if not rec or "pwhash" not in rec:
+            _check_password(password, _DUMMY_HASH)
+            return False
+        return _check_password(password, rec["pwhash"])
 
     def forgot_password(self, username: str) -> str:
         """Always return a friendly stub message (no real email)."""
@@ -25,4 +68,4 @@ class AuthService:
 
     def get_profile(self, username: str) -> Optional[Dict[str, str]]:
         """Return profile dict for UI personalization."""
-        return self._users.get(username)
+        return self._users.get(_normalize_username(username))
@@ -1,17 +1,68 @@
 # Purpose of imports:
-# - json: serialize/deserialize our app state to a local file (store.json)
+# - json / orjson: serialize/deserialize our app state to a local file (store.json);
+#   orjson (compact, C-implemented) when installed, stdlib json otherwise
+# - mmap: map large snapshots instead of copying them into a bytes object
+# - os: low-level append-only writes for the write-ahead log (store.wal)
+#   and single-syscall (writev) snapshot writes
+# - struct: fixed binary header in front of the snapshot body
 # - pathlib.Path: robust file paths across OSes (create dirs, read/write files)
 # - typing: type hints for clarity and editor tooling
+# - weakref: close the WAL descriptor when an instance is dropped without close()
 import json
+import mmap
+import os
+import struct
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 import shutil
-from datetime import datetime
+import time
+import weakref
+
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    _loads = orjson.loads
+    _LOADS_MEMORYVIEW = True  # orjson parses straight from a buffer (e.g. an mmap)
+except ImportError:  # optional speedup; stdlib json works the same
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    _loads = json.loads
+    _LOADS_MEMORYVIEW = False
+
+# Snapshot framing: magic, format version, body length, then the JSON body.
+# Files without the magic are read as plain JSON (older snapshots, test fixtures).
+_SNAPSHOT_MAGIC = b"BSPL"
+_SNAPSHOT_VERSION = 1
+_SNAPSHOT_HEADER = struct.Struct("<4sII")
+
+
+def _write_all(fd: int, *chunks: bytes) -> None:
+    """Write every chunk to fd in order, resuming after short writes."""
+    views = [memoryview(c) for c in chunks if c]
+    while views:
+        if hasattr(os, "writev"):
+            n = os.writev(fd, views)
+        else:  # e.g. Windows
+            n = os.write(fd, views[0])
+        if n <= 0:
+            raise OSError("write made no progress")
+        # Drop what went out; a partially written chunk resumes at its offset
+        while n:
+            if n >= len(views[0]):
+                n -= len(views.pop(0))
+            else:
+                views[0] = views[0][n:]
+                n = 0
 
 
 class CacheService:
     """
-    Manages the application state in-memory and persists it as JSON.
+    Manages the application state in-memory and persists it as a JSON snapshot
+    (behind a small binary header, see _SNAPSHOT_HEADER).
     State shape (minimal to start):
       {
         "users": [ { "username": str, "name": str, "password": str } ],
@@ -19,15 +70,44 @@ class CacheService:
         "expenses": [ { ...serialized Expense... } ],
         "settlements": [ { ...serialized Settlement... } ]
       }
+    Appends are also logged one JSON line each to a write-ahead log next to the
+    snapshot (store.wal), so a mutation costs one small write instead of a full
+    rewrite. Every snapshot bumps a generation number stored in it, and log lines
+    carry the generation they were written under: replay skips lines older than
+    the snapshot. Durable snapshots also truncate the log; a non-empty log is
+    folded into the snapshot at load and whenever it grows past
+    _WAL_CHECKPOINT_BYTES, so it stays short.
     """
 
+    # Record identity per state key, used to skip WAL entries already in the snapshot
+    _KEYS = {"users": "username", "groups": "id", "expenses": "id", "settlements": "id"}
+    # Snapshots larger than this are parsed from an mmap (no full bytes copy)
+    _MMAP_MIN = 1024 * 1024
+    # Log size at which an append folds everything into a fresh snapshot
+    _WAL_CHECKPOINT_BYTES = 1024 * 1024
+
     def __init__(self, path: str = "data/store.json") -> None:
         # Where JSON snapshot lives (and ensure folder exists)
         self.path = Path(path)
         self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.wal_path = self.path.with_suffix(".wal")
+        self._wal_fd: Optional[int] = None  # opened on first append, see close()
+        self._wal_closer: Optional[weakref.finalize] = None
+        self._wal_size = 0  # bytes of intact records currently in the log
+        self._gen = 0  # generation of the last snapshot read or written
+
+        # State is read from disk lazily, on first access (see `state`)
+        self._loaded = False
+        self._state: Dict[str, Any] = {}
+        self._users_by_name: Dict[str, Dict[str, Any]] = {}
+        self._groups_by_id: Dict[str, Dict[str, Any]] = {}
+
+    def _load(self) -> None:
+        """Read the snapshot, fold in the WAL and build lookup indexes (runs once)."""
+        self._loaded = True
 
         # Default empty state
-        self.state: Dict[str, Any] = {
+        self._state = {
             "users": [],
             "groups": [],
             "expenses": [],
@@ -35,56 +115,209 @@ class CacheService:
         }
 
         # Load from disk if present
+        snapshot_ok = True
         if self.path.exists():
             try:
-                loaded = json.loads(self.path.read_text())
+                loaded = self._read_snapshot()
+                self._gen = loaded.get("gen", 0)
                 # Shallow merge to keep expected keys even if file is partial
-                for k in self.state:
+                for k in self._state:
                     if k in loaded:
-                        self.state[k] = loaded[k]
+                        self._state[k] = loaded[k]
             except json.JSONDecodeError:
                 # Corrupt or empty file → keep defaults; caller may choose to overwrite
-                pass
+                snapshot_ok = False
+
+        # Fold in anything appended since the last snapshot
+        self._replay_wal()
+        self._reindex()
+
+        # Persist the replayed log as a snapshot so it doesn't pile up across restarts
+        # (not over an unreadable snapshot: that is left for the caller to inspect)
+        if self._wal_size and snapshot_ok:
+            self.save(durable=True)
+
+    def _read_snapshot(self) -> Any:
+        """Parse store.json; big files are handed to the parser as a memory map."""
+        if not _LOADS_MEMORYVIEW or self.path.stat().st_size <= self._MMAP_MIN:
+            return self._parse_snapshot(self.path.read_bytes())
+        with open(self.path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                return self._parse_snapshot(view)
+
+    @staticmethod
+    def _parse_snapshot(buf: Any) -> Any:
+        """Strip the header if present (bytes or memoryview), then parse the JSON body."""
+        if len(buf) >= _SNAPSHOT_HEADER.size and buf[:4] == _SNAPSHOT_MAGIC:
+            _, version, length = _SNAPSHOT_HEADER.unpack_from(buf)
+            if version != _SNAPSHOT_VERSION:
+                raise ValueError(f"Unsupported snapshot version: {version}")
+            body = buf[_SNAPSHOT_HEADER.size:_SNAPSHOT_HEADER.size + length]
+            if isinstance(body, memoryview):
+                # Release the slice even if parsing raises: a live export keeps
+                # the caller's mmap from closing (BufferError instead of the parse error)
+                with body:
+                    return _loads(body)
+            return _loads(body)
+        return _loads(buf)
+
+    # ---------- state + lookup indexes ----------
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            self._load()
+
+    @property
+    def state(self) -> Dict[str, Any]:
+        self._ensure_loaded()
+        return self._state
+
+    @state.setter
+    def state(self, value: Dict[str, Any]) -> None:
+        # Callers may swap the whole state (e.g. tests resetting it): no disk read
+        # needed, just keep the indexes in step. The log on disk describes the
+        # replaced state, so it is dropped rather than replayed over the new one.
+        self._loaded = True
+        self._state = value
+        self._reindex()
+        self._truncate_wal()
+
+    def _reindex(self) -> None:
+        """Rebuild O(1) lookup maps over users/groups (dicts shared with the state lists)."""
+        self._users_by_name = {u["username"]: u for u in self._state.get("users", [])}
+        self._groups_by_id = {g["id"]: g for g in self._state.get("groups", [])}
 
     # ---------- persistence ----------
-    def save(self, backup: bool = True) -> None:
+    def save(self, backup: bool = False, durable: bool = False) -> None:
         """
-        Atomic write: write to temp then replace. Optional timestamped backup in data/backups/.
+        Write the snapshot under a new generation via temp file + replace, so a
+        crash mid-write leaves the previous snapshot intact. durable=True also
+        fsyncs it and then truncates the WAL; otherwise the log is kept (for a
+        power loss before the data reaches disk) and replay skips its older lines.
+        Backups are opt-in (see rotate_backup); crash safety between snapshots comes
+        from the WAL, not from per-save copies.
         """
-        tmp = self.path.with_suffix(".tmp")
+        self._gen += 1
+        body = _dumps({**self.state, "gen": self._gen})
         self.path.parent.mkdir(parents=True, exist_ok=True)
-        tmp.write_text(json.dumps(self.state, indent=2))
+        tmp = self.path.with_suffix(".tmp")
+        self._write_snapshot(tmp, body, sync=durable)
         if backup:
-            bdir = self.path.parent / "backups"
-            bdir.mkdir(parents=True, exist_ok=True)
-            stamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
-            shutil.copy2(self.path, bdir / f"store-{stamp}.json") if self.path.exists() else None
+            self.rotate_backup()
         tmp.replace(self.path)
+        if durable:
+            # Snapshot is on disk and holds every logged record
+            self._truncate_wal()
+
+    @staticmethod
+    def _write_snapshot(target: Path, body: bytes, sync: bool) -> None:
+        """Header + body in one vectored write (no concatenation copy), retried until complete."""
+        hdr = _SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, _SNAPSHOT_VERSION, len(body))
+        fd = os.open(target, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+        try:
+            _write_all(fd, hdr, body)
+            if sync:
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def rotate_backup(self) -> None:
+        """Copy the current snapshot to a timestamped file in data/backups/."""
+        if not self.path.exists():
+            return
+        bdir = self.path.parent / "backups"
+        bdir.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.gmtime())
+        shutil.copy2(self.path, bdir / f"store-{stamp}.json")
+
+    def checkpoint(self) -> None:
+        """Fold the WAL into the JSON snapshot (atomic, fsynced), keeping a backup of the previous one."""
+        self.save(backup=True, durable=True)
+
+    # ---------- write-ahead log ----------
+    def append_wal(self, kind: str, *records: Dict[str, Any]) -> None:
+        """Log appended records (kind = state key) as JSON lines with a single write()."""
+        if not records:
+            return
+        if self._wal_fd is None:
+            self._wal_fd = os.open(self.wal_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            # Sessions drop their services without closing them: release the fd on GC too
+            self._wal_closer = weakref.finalize(self, os.close, self._wal_fd)
+        data = b"".join(_dumps({"k": kind, "g": self._gen, "d": d}) + b"\n" for d in records)
+        _write_all(self._wal_fd, data)
+        self._wal_size += len(data)
+        if self._wal_size > self._WAL_CHECKPOINT_BYTES:
+            self.save(durable=True)
+
+    def _replay_wal(self) -> None:
+        """
+        Append logged records missing from the loaded snapshot: lines from an older
+        generation are already in it (or were removed since), ids already present are skipped.
+        """
+        if not self.wal_path.exists():
+            return
+        seen = {k: {r.get(f) for r in self.state[k]} for k, f in self._KEYS.items()}
+        good = 0  # byte offset just past the last intact record
+        with self.wal_path.open("rb") as fh:
+            for line in fh:
+                try:
+                    rec = _loads(line)
+                except json.JSONDecodeError:
+                    break
+                good += len(line)
+                if rec.get("g", 0) < self._gen:
+                    continue
+                kind, data = rec["k"], rec["d"]
+                key = data.get(self._KEYS[kind])
+                if key not in seen[kind]:
+                    self.state[kind].append(data)
+                    seen[kind].add(key)
+        # Drop a torn tail from an interrupted write so later appends stay line-aligned
+        if good < self.wal_path.stat().st_size:
+            os.truncate(self.wal_path, good)
+        self._wal_size = good
+
+    def close(self) -> None:
+        """Release the WAL descriptor; a later append reopens it."""
+        if self._wal_closer is not None:
+            self._wal_closer()  # runs os.close once
+            self._wal_closer = None
+        self._wal_fd = None
+
+    def _truncate_wal(self) -> None:
+        if self._wal_fd is not None:
+            os.ftruncate(self._wal_fd, 0)
+        elif self.wal_path.exists():
+            os.truncate(self.wal_path, 0)
+        self._wal_size = 0
 
     # ---- users (dedupe) ----
     def add_user(self, username: str, name: str, password: str) -> None:
-        if not any(u["username"] == username for u in self.state["users"]):
-            self.state["users"].append({"username": username, "name": name, "password": password})
+        self._ensure_loaded()
+        if username not in self._users_by_name:
+            data = {"username": username, "name": name, "password": password}
+            self._state["users"].append(data)
+            self._users_by_name[username] = data
+            self.append_wal("users", data)
 
     def get_user(self, username: str) -> Optional[Dict[str, Any]]:
         """Return user dict or None."""
-        for u in self.state["users"]:
-            if u["username"] == username:
-                return u
-        return None
+        self._ensure_loaded()
+        return self._users_by_name.get(username)
 
     # ---------- groups ----------
     # ---- groups (dedupe) ----
     def add_group(self, gid: str, name: str) -> None:
-        if not any(g["id"] == gid for g in self.state["groups"]):
-            self.state["groups"].append({"id": gid, "name": name})
+        self._ensure_loaded()
+        if gid not in self._groups_by_id:
+            data = {"id": gid, "name": name}
+            self._state["groups"].append(data)
+            self._groups_by_id[gid] = data
+            self.append_wal("groups", data)
 
     def get_group(self, gid: str) -> Optional[Dict[str, Any]]:
         """Fetch a group by id."""
-        for g in self.state["groups"]:
-            if g["id"] == gid:
-                return g
-        return None
+        self._ensure_loaded()
+        return self._groups_by_id.get(gid)
 
     # ---------- expenses ----------
     def add_expense(self, data: Dict[str, Any]) -> None:
@@ -93,16 +326,28 @@ class CacheService:
         (Serialization from model → dict will be handled by ExpenseManager.)
         """
         self.state["expenses"].append(data)
+        self.append_wal("expenses", data)
+
+    def add_expenses(self, records: List[Dict[str, Any]]) -> None:
+        """Bulk variant of add_expense: one list extend, one WAL write."""
+        self.state["expenses"].extend(records)
+        self.append_wal("expenses", *records)
 
     def list_expenses(self) -> List[Dict[str, Any]]:
-        """Return all expense dicts."""
-        return list(self.state["expenses"])
+        """Return all expense dicts. This is the live list, not a copy: read-only for callers."""
+        return self.state["expenses"]
 
     # ---------- settlements ----------
     def add_settlement(self, data: Dict[str, Any]) -> None:
         """Add a serialized settlement dict."""
         self.state["settlements"].append(data)
+        self.append_wal("settlements", data)
+
+    def add_settlements(self, records: List[Dict[str, Any]]) -> None:
+        """Bulk variant of add_settlement: one list extend, one WAL write."""
+        self.state["settlements"].extend(records)
+        self.append_wal("settlements", *records)
 
     def list_settlements(self) -> List[Dict[str, Any]]:
-        """Return all settlement dicts."""
-        return list(self.state["settlements"])
+        """Return all settlement dicts. This is the live list, not a copy: read-only for callers."""
+        return self.state["settlements"]
@@ -1,28 +1,48 @@
-# asdict: convert simple dataclasses to dicts for JSON storage
-from dataclasses import asdict
-
 # typing: Dict/Any/List/Optional for clean, explicit signatures
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+# bisect: keep the in-memory timeline sorted on back-dated inserts
+import bisect
+
+# lru_cache: memoize ISO date parsing across records and rebuilds
+from functools import lru_cache
+
+# uuid: per-instance token for keying process-wide UI caches
+from uuid import uuid4
 
 # datetime: parse ISO strings back to datetime
-from datetime import datetime
+from datetime import datetime, timezone
 
 # Local domain models
 from core.models.expense import Expense, Settlement
 from core.models.ledger import Ledger
 
+# Currency rounding shared with the UI
+from core.utils.money import qround
+
 # Persistence + auth services
 from core.services.cache import CacheService
 from core.services.auth import AuthService
 
-# Split strategies: used to re-instantiate strategy objects by name
+# Split strategies: shared instances looked up by class name on load
 from core.models.splits import SplitStrategy, EqualSplit, ExactSplit, ShareSplit
 
 
+@lru_cache(maxsize=8192)
+def _parse_iso(s: str) -> datetime:
+    """
+    Parse a stored ISO date; older records are naive UTC, so attach the tz.
+    Memoized: datetimes are immutable and rebuilds re-parse the same strings.
+    """
+    dt = datetime.fromisoformat(s)
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
 class ExpenseManager:
     """
     Orchestrates domain models and persistence for UI consumption.
-    - Serializes to CacheService on write
+    - Serializes to CacheService on write (appended to its WAL, not fsynced);
+      flush() folds the log into a durable JSON snapshot
     - Rebuilds Ledger from persisted records on load
     """
 
@@ -30,40 +50,145 @@ class ExpenseManager:
         self.cache = cache or CacheService()
         self.auth = auth or AuthService()
         self.ledger = Ledger()
-        self._strategy_map = {
-            "EqualSplit": EqualSplit,
-            "ExactSplit": ExactSplit,
-            "ShareSplit": ShareSplit,
+        # Strategies are stateless, so every deserialized expense shares one instance per kind
+        self._strategy_map: Dict[str, SplitStrategy] = {
+            "EqualSplit": EqualSplit(),
+            "ExactSplit": ExactSplit(),
+            "ShareSplit": ShareSplit(),
         }
+        assert not any(vars(s) for s in self._strategy_map.values()), "split strategies must be stateless"
+        # Unique per instance (unlike id(), never reused after GC) and a monotonic
+        # ledger revision that bumps on every mutation: UI caches key on both
+        self.instance_id: str = uuid4().hex
+        self._rev: int = 0
+        # Set by mutators; flush() checkpoints once and clears it
+        self._dirty: bool = False
+        # Activity feed built lazily from cache records; reset on every mutation
+        self._events_cache: Optional[List[Dict[str, Any]]] = None
+        # Per-user ledger.net_for results; cleared on every mutation
+        self._net_cache: Dict[str, Dict[str, float]] = {}
+        # Deserialized records by id, reused across rebuilds (see invalidate())
+        self._exp_cache: Dict[str, Expense] = {}
+        self._set_cache: Dict[str, Settlement] = {}
+        # Date of the newest record applied to the ledger; later records apply incrementally
+        self._last_applied_date: Optional[datetime] = None
+        # Persistent chronological timeline of (date, seq, kind, obj); seq breaks date ties
+        # in insertion order, so tuple comparison never reaches kind/obj
+        self._timeline: List[Tuple[datetime, int, str, Any]] = []
+        self._seq: int = 0
         # Build ledger immediately from whatever is already in cache
         self.rebuild_ledger()
 
     # ---------- public ops ----------
     def add_expense(self, exp: Expense) -> None:
-        """Persist expense → JSON, then rebuild ledger."""
-        self.cache.add_expense(self._serialize_expense(exp))
-        self.cache.save()
-        self.rebuild_ledger()
+        """Append one expense (thin wrapper over add_many)."""
+        self.add_many(expenses=[exp])
 
     def add_settlement(self, st: Settlement) -> None:
-        """Persist settlement → JSON, then rebuild ledger."""
-        self.cache.add_settlement(self._serialize_settlement(st))
-        self.cache.save()
+        """Append one settlement (thin wrapper over add_many)."""
+        self.add_many(settlements=[st])
+
+    def add_many(self, expenses: Iterable[Expense] = (), settlements: Iterable[Settlement] = ()) -> None:
+        """
+        Append a batch of records: one WAL write per kind (no snapshot) and one
+        revision bump. Records dated at or after the newest applied one are applied
+        to the ledger directly; a back-dated one is inserted into the sorted
+        timeline and the ledger is replayed from it.
+        """
+        expenses, settlements = list(expenses), list(settlements)
+        if not expenses and not settlements:
+            return
+        self.cache.add_expenses([self._serialize_expense(e) for e in expenses])
+        self.cache.add_settlements([self._serialize_settlement(s) for s in settlements])
+        self._exp_cache.update((e.id, e) for e in expenses)
+        self._set_cache.update((s.id, s) for s in settlements)
+        self._dirty = True
+
+        batch = [self._entry(e.date, "expense", e) for e in expenses]
+        batch += [self._entry(s.date, "settlement", s) for s in settlements]
+        batch.sort()
+        if self._last_applied_date is None or batch[0][0] >= self._last_applied_date:
+            # Common case: newer than everything applied → extend and apply in place
+            self._timeline.extend(batch)
+            self.ledger.apply_many(obj for _, _, _, obj in batch)
+            self._last_applied_date = batch[-1][0]
+        else:
+            # Back-dated: slot into the sorted timeline and replay (no re-parse, no re-sort)
+            for entry in batch:
+                bisect.insort(self._timeline, entry)
+            self._replay()
+        self._bump()
+
+    def reload(self) -> None:
+        """Full rebuild from the cache, e.g. after its state was replaced or edited in place."""
+        self._exp_cache.clear()
+        self._set_cache.clear()
         self.rebuild_ledger()
+        self._bump()
+
+    def _bump(self) -> None:
+        """Ledger changed: new revision, drop every derived view."""
+        self._rev += 1
+        self._events_cache = None
+        self._net_cache.clear()
+
+    def invalidate(self, record_id: str) -> None:
+        """Forget the cached object for an edited/removed record; call reload() to re-apply."""
+        self._exp_cache.pop(record_id, None)
+        self._set_cache.pop(record_id, None)
+
+    def flush(self) -> None:
+        """Checkpoint logged mutations into the snapshot; no-op if nothing changed."""
+        if self._dirty:
+            self.cache.checkpoint()
+            self._dirty = False
 
     def balances_for(self, username: str) -> Dict[str, float]:
-        """Convenience for UI: what does `username` owe / is owed by others?"""
-        return self.ledger.net_for(username)
+        """
+        Convenience for UI: what does `username` owe / is owed by others?
+        The ledger walk runs once per user per revision; callers get their own copy.
+        """
+        net = self._net_cache.get(username)
+        if net is None:
+            net = self._net_cache[username] = self.ledger.net_for(username)
+        return dict(net)
 
     def dashboard_totals(self, username: str) -> Tuple[float, float]:
         """
         Aggregate totals for dashboard cards:
         returns (you_owe_total, others_owe_you_total)
         """
-        net = self.ledger.net_for(username)
-        you_owe = sum(v for v in net.values() if v > 0)
-        others_owe_you = -sum(v for v in net.values() if v < 0)
-        return round(you_owe, 2), round(others_owe_you, 2)
+        you_owe, others_owe_you = self.ledger.totals_for(username)
+        # qround also folds incremental float drift (e.g. -1e-15 → -0.0) to a clean 0.0
+        return qround(you_owe), qround(others_owe_you)
+
+    def list_events(self) -> List[Dict[str, Any]]:
+        """
+        Flat activity feed (expenses + settlements) for the UI, unsorted.
+        Built once and reused until the next add_expense/add_settlement.
+        """
+        if self._events_cache is None:
+            events: List[Dict[str, Any]] = []
+            for e in self.cache.list_expenses():
+                events.append({
+                    "when": e.get("date"),
+                    "when_iso": self._when_iso(self._exp_cache, e),
+                    "type": "Expense",
+                    "who": e.get("payer"),
+                    "desc": e.get("description"),
+                    "amount": e.get("amount"),
+                })
+            for s in self.cache.list_settlements():
+                events.append({
+                    "when": s.get("date"),
+                    "when_iso": self._when_iso(self._set_cache, s),
+                    "type": "Settlement",
+                    "who": f'{s.get("payer")} → {s.get("payee")}',
+                    "desc": s.get("description"),
+                    "amount": s.get("amount"),
+                })
+            self._events_cache = events
+        return self._events_cache
 
     # ---------- reconstruction ----------
     def rebuild_ledger(self) -> None:
@@ -71,53 +196,92 @@ class ExpenseManager:
         Recompute ledger by deserializing expenses and settlements from cache.
         We apply in chronological order by 'date' to keep mental model consistent.
         """
-        self.ledger = Ledger()
+        # Build sortable timelines for expenses and settlements,
+        # deserializing only records not already cached by id
+        exps: List[Expense] = []
+        for d in self.cache.list_expenses():
+            obj = self._exp_cache.get(d["id"])
+            if obj is None:
+                obj = self._exp_cache[d["id"]] = self._deserialize_expense(d)
+            exps.append(obj)
+        sets: List[Settlement] = []
+        for d in self.cache.list_settlements():
+            obj = self._set_cache.get(d["id"])
+            if obj is None:
+                obj = self._set_cache[d["id"]] = self._deserialize_settlement(d)
+            sets.append(obj)
 
-        # Build sortable timelines for expenses and settlements
-        exps = [self._deserialize_expense(d) for d in self.cache.list_expenses()]
-        sets = [self._deserialize_settlement(d) for d in self.cache.list_settlements()]
+        # Merge into the persistent timeline, sorted by date (ties keep cache order)
+        self._seq = 0
+        self._timeline = [self._entry(e.date, "expense", e) for e in exps]
+        self._timeline += [self._entry(s.date, "settlement", s) for s in sets]
+        self._timeline.sort()
+        self._replay()
 
-        # Merge timelines and apply in date order
-        timeline: List[Tuple[datetime, str, Any]] = []
-        for e in exps:
-            timeline.append((e.date, "expense", e))
-        for s in sets:
-            timeline.append((s.date, "settlement", s))
+    def _entry(self, date: datetime, kind: str, obj: Any) -> Tuple[datetime, int, str, Any]:
+        self._seq += 1
+        return (date, self._seq, kind, obj)
 
-        timeline.sort(key=lambda t: t[0])  # sort by datetime ascending
-
-        for _, kind, obj in timeline:
-            if kind == "expense":
-                self.ledger.apply_expense(obj)
-            else:
-                self.ledger.apply_settlement(obj)
+    def _replay(self) -> None:
+        """Fresh ledger from the already-sorted timeline."""
+        self.ledger = Ledger()
+        self._net_cache.clear()
+        self.ledger.apply_many(obj for _, _, _, obj in self._timeline)
+        self._last_applied_date = self._timeline[-1][0] if self._timeline else None
 
     # ---------- (de)serialization helpers ----------
+    @staticmethod
+    def _when_iso(objs: Dict[str, Any], rec: Dict[str, Any]) -> str:
+        """
+        Seconds-precision ISO string for the activity feed: the model's precomputed
+        date_iso, parsed from the record only if it was invalidate()d and not reloaded.
+        """
+        obj = objs.get(rec.get("id"))
+        if obj is not None:
+            return obj.date_iso
+        raw = rec.get("date")
+        return _parse_iso(raw).isoformat(timespec="seconds") if raw else ""
+
     def _serialize_expense(self, exp: Expense) -> Dict[str, Any]:
         """
         Make a JSON-friendly dict from an Expense.
         Note: Replace strategy instance with its class name; ISO-encode datetime.
+        Built field by field (no asdict deep copy); `participants` is shared by
+        reference, so callers must not mutate it after adding the expense.
         """
-        data = asdict(exp)
-        data["split_strategy"] = exp.split_strategy.__class__.__name__
-        data["date"] = exp.date.isoformat()
-        return data
+        return {
+            "id": exp.id,
+            "description": exp.description,
+            "amount": exp.amount,
+            "payer": exp.payer,
+            "participants": exp.participants,
+            "split_strategy": type(exp.split_strategy).__name__,
+            "notes": exp.notes,
+            "date": exp.date.isoformat(),
+            "group_id": exp.group_id,
+        }
 
     def _serialize_settlement(self, st: Settlement) -> Dict[str, Any]:
         """JSON-friendly dict for Settlement with ISO date."""
-        data = asdict(st)
-        data["date"] = st.date.isoformat()
-        return data
+        return {
+            "id": st.id,
+            "payer": st.payer,
+            "payee": st.payee,
+            "amount": st.amount,
+            "description": st.description,
+            "date": st.date.isoformat(),
+            "notes": st.notes,
+        }
 
     def _deserialize_expense(self, data: Dict[str, Any]) -> Expense:
         """
         Turn dict back into an Expense instance.
-        - Re-create strategy object by name
+        - Look up the shared strategy object by name
         - Parse ISO date
         """
         strat_name = data["split_strategy"]
-        strat_cls = self._strategy_map.get(strat_name)
-        if not strat_cls:
+        strategy = self._strategy_map.get(strat_name)
+        if strategy is None:
             raise ValueError(f"Unknown split strategy: {strat_name}")
 
         return Expense(
@@ -126,9 +290,9 @@ class ExpenseManager:
             amount=float(data["amount"]),
             payer=data["payer"],
             participants={k: float(v) for k, v in data["participants"].items()},
-            split_strategy=strat_cls(),  # instantiate strategy
+            split_strategy=strategy,
             notes=data.get("notes", ""),
-            date=datetime.fromisoformat(data["date"]),
+            date=_parse_iso(data["date"]),
             group_id=data.get("group_id"),
         )
 
@@ -140,6 +304,6 @@ class ExpenseManager:
             payee=data["payee"],
             amount=float(data["amount"]),
             description=data.get("description", ""),
-            date=datetime.fromisoformat(data["date"]),
+            date=_parse_iso(data["date"]),
             notes=data.get("notes", ""),
         )
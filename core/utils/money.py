@@ -7,8 +7,9 @@ def qround(x: float, ndigits: int = 2) -> float:
     """
     Quantized round for currency; keeps small negative zeros out.
     """
-    v = round(float(x) + 0.0, ndigits)
-    return 0.0 if abs(v) < EPS else v
+    v = round(x, ndigits)
+    # -0.0 and 0 are falsy → plain 0.0; `+ 0.0` keeps int input a float
+    return v + 0.0 if v else 0.0
 
 def fmt(amount: float, symbol: str = "₹") -> str:
     """
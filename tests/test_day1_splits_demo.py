@@ -0,0 +1,49 @@
+# Run with:  python -m tests.test_day1_splits_demo
+# This verifies: Equal/Share splits assign cents exactly as the original fix-up loop did,
+# so balances rebuilt from stored expenses don't shift by a cent
+
+import random
+
+from core.models.splits import EqualSplit, ShareSplit
+from core.utils.money import qround, EPS
+
+def legacy_fixup(amount, users, shares):
+    # The original remainder loop, kept verbatim as the reference
+    diff = qround(amount - sum(shares))
+    i = 0
+    step = 0.01 if diff > 0 else -0.01
+    while abs(diff) >= 0.01 - EPS and i < 1000:
+        idx = i % len(users)
+        shares[idx] = qround(shares[idx] + step)
+        diff = qround(amount - sum(shares))
+        i += 1
+    return {u: s for u, s in zip(users, shares)}
+
+def legacy_equal(amount, participants):
+    users = list(participants)
+    return legacy_fixup(amount, users, [qround(amount / len(users)) for _ in users])
+
+def legacy_share(amount, participants):
+    weights = {k: float(v) for k, v in participants.items()}
+    total_w = sum(weights.values())
+    users = list(weights)
+    return legacy_fixup(amount, users, [qround(amount * (weights[u] / total_w)) for u in users])
+
+def main():
+    # Known case where the per-head share rounds up: the cent comes off the front
+    assert EqualSplit().split(200.0, {"you": 1, "sam": 1, "lee": 1}) == {"you": 66.66, "sam": 66.67, "lee": 66.67}
+
+    rng = random.Random(7)
+    for _ in range(5000):
+        amount = rng.randint(1, 100_000) / 100
+        n = rng.randint(1, 9)
+        names = [f"u{i}" for i in range(n)]
+        equal = {u: 1 for u in names}
+        shares = {u: rng.randint(1, 5) for u in names}
+        assert EqualSplit().split(amount, equal) == legacy_equal(amount, equal), (amount, n)
+        assert ShareSplit().split(amount, shares) == legacy_share(amount, shares), (amount, shares)
+
+    print("Split regression test passed.")
+
+if __name__ == "__main__":
+    main()
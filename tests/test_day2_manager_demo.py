@@ -46,6 +46,11 @@ def main():
     you_owe, others_owe_you = mgr.dashboard_totals("you")
     assert you_owe == 0.0 and others_owe_you == 40.0
 
+    # flush → reload from disk → same balances
+    mgr.flush()
+    reloaded = ExpenseManager(cache=CacheService("data/test_store.json"))
+    assert reloaded.balances_for("you") == net_you
+
     print("Manager end-to-end test passed. Current net for you:", net_you)
 
 if __name__ == "__main__":
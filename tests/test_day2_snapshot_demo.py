@@ -0,0 +1,36 @@
+# Run with:  python -m tests.test_day2_snapshot_demo
+# This verifies: large framed snapshot → mmap load; corrupt large snapshot → empty state (no crash)
+
+import os
+
+from core.services.cache import CacheService
+
+PATH = "data/test_snapshot.json"
+
+def main():
+    # Big enough to take the mmap path on load
+    cache = CacheService(PATH)
+    cache.state = {
+        "users": [],
+        "groups": [],
+        "expenses": [{"id": f"e{i}", "description": "x" * 40} for i in range(40000)],
+        "settlements": [],
+    }
+    cache.save()
+    size = os.path.getsize(PATH)
+    assert size > CacheService._MMAP_MIN
+
+    loaded = CacheService(PATH)
+    assert len(loaded.state["expenses"]) == 40000
+
+    # Chop the tail off: the parse error must be handled like any corrupt file,
+    # not surface as a BufferError from closing the map
+    os.truncate(PATH, size - 50)
+    corrupt = CacheService(PATH)
+    assert corrupt.state["expenses"] == []
+
+    os.remove(PATH)
+    print("Snapshot framing + mmap test passed.")
+
+if __name__ == "__main__":
+    main()
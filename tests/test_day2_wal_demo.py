@@ -0,0 +1,63 @@
+# Run with:  python -m tests.test_day2_wal_demo
+# This verifies: appends → WAL → replay on load (id dedupe, torn tail dropped) → folded into the snapshot;
+# removals and full resets survive a non-durable save()
+
+import os
+
+from core.services.cache import CacheService
+
+PATH = "data/test_wal.json"
+WAL = "data/test_wal.wal"
+
+def ids(cache):
+    return [e["id"] for e in cache.list_expenses()]
+
+def main():
+    # Snapshot holds e0; e1/e2 only reach the log
+    cache = CacheService(PATH)
+    cache.state = {"users": [], "groups": [], "expenses": [{"id": "e0"}], "settlements": []}
+    cache.save()
+    cache.add_expense({"id": "e1"})
+    cache.add_expense({"id": "e2"})
+    assert os.path.getsize(WAL) > 0
+
+    # Simulate a crash: a current-generation entry for a record the snapshot
+    # already has, then a line cut off mid-write
+    gen = cache._gen
+    with open(WAL, "ab") as fh:
+        fh.write(b'{"k":"expenses","g":%d,"d":{"id":"e0"}}\n' % gen)
+        fh.write(b'{"k":"expenses","g":%d,"d":{"id":"e3"' % gen)
+
+    # Replay: e0 not duplicated, torn e3 dropped, log folded into the snapshot
+    reloaded = CacheService(PATH)
+    assert ids(reloaded) == ["e0", "e1", "e2"]
+    assert os.path.getsize(WAL) == 0
+
+    # The snapshot alone now holds everything, and later appends stay line-aligned
+    reloaded.add_expense({"id": "e4"})
+    again = CacheService(PATH)
+    assert ids(again) == ["e0", "e1", "e2", "e4"]
+
+    # A plain save() keeps the log, but its older lines must not resurrect
+    # records removed since they were written
+    again.add_expense({"id": "e5"})
+    again.list_expenses()[:] = [e for e in again.list_expenses() if e["id"] != "e5"]
+    again.save()
+    assert os.path.getsize(WAL) > 0
+    assert "e5" not in ids(CacheService(PATH))
+
+    # Replacing the whole state drops the log along with it
+    again.add_expense({"id": "e6"})
+    again.state = {"users": [], "groups": [], "expenses": [], "settlements": []}
+    again.save()
+    assert ids(CacheService(PATH)) == []
+
+    cache.close()
+    reloaded.close()
+    again.close()
+    os.remove(PATH)
+    os.remove(WAL)
+    print("WAL replay + checkpoint test passed.")
+
+if __name__ == "__main__":
+    main()